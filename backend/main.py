@@ -1,5 +1,5 @@
-from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Query, Request
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 import dns.resolver
 import whois
@@ -10,11 +10,37 @@ import logging
 from requests.adapters import HTTPAdapter, Retry
 import ssl
 import socket
-from typing import Dict, List, Any, Tuple, Optional
+from typing import Dict, List, Any, Tuple, Optional, Union
+import sys
 import time
 import urllib3
 from datetime import datetime
+from types import SimpleNamespace
 import concurrent.futures
+import gzip
+import json
+import math
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 # ============================================================
 # ⚙️ Setup & Config
@@ -57,7 +83,75 @@ def normalize_domain(domain: str) -> str:
     domain = re.sub(r"^https?://", "", domain.strip().lower())
     domain = re.sub(r"^www\.", "", domain)
     domain = re.sub(r"/.*$", "", domain)
-    return domain.split(':')[0]
+    domain = domain.split(':')[0].rstrip(".")
+    try:
+        return domain.encode("idna").decode("ascii")
+    except UnicodeError:
+        return domain
+
+def is_valid_domain(domain: str) -> bool:
+    if len(domain) < 3 or not re.match(r'^[a-z0-9.-]+\.(?:[a-z]{2,}|xn--[a-z0-9-]+)$', domain):
+        return False
+    return registrable_domain(domain) is not None
+
+# ICANN section of the Public Suffix List (https://publicsuffix.org/list/), bundled so
+# lookups never touch the network. Private suffixes are skipped on purpose: WHOIS and
+# the zone's NS/MX records live at the ICANN registrable domain.
+PUBLIC_SUFFIX_LIST = os.path.join(os.path.dirname(os.path.abspath(__file__)), "public_suffix_list.dat")
+
+@lru_cache(maxsize=None)
+def get_suffix_trie() -> Dict[str, Any]:
+    """Compile the suffix list into a trie keyed by labels from the TLD inwards.
+
+    A node holds its child labels plus "$" when a rule ends there and "!" for
+    exception rules; wildcard rules live under a "*" child.
+    """
+    trie: Dict[str, Any] = {}
+    try:
+        with open(PUBLIC_SUFFIX_LIST, encoding="utf-8") as f:
+            for line in f:
+                rule = line.strip()
+                if rule.startswith("// ===END ICANN DOMAINS==="):
+                    break
+                if not rule or rule.startswith("//"):
+                    continue
+                exception = rule.startswith("!")
+                node = trie
+                for label in reversed(rule.lstrip("!").encode("idna").decode("ascii").split(".")):
+                    node = node.setdefault(sys.intern(label), {})
+                node["!" if exception else "$"] = True
+    except OSError as e:
+        logger.warning(f"Public suffix list unavailable, falling back to last-two-labels: {e}")
+    return trie
+
+def registrable_domain(domain: str) -> Optional[str]:
+    """Return the registrable domain (public suffix plus one label), or None if `domain` is itself a public suffix."""
+    labels = domain.split(".")
+    if "" in labels:
+        return None
+    node = get_suffix_trie()
+    suffix_len = 1  # implicit "*" rule
+    for depth, label in enumerate(reversed(labels), start=1):
+        if label in node:
+            node = node[label]
+        elif "*" in node:
+            node = node["*"]
+        else:
+            break
+        if "!" in node:
+            suffix_len = depth - 1
+            break
+        if "$" in node:
+            suffix_len = depth
+    if suffix_len >= len(labels):
+        return None
+    return ".".join(labels[-suffix_len - 1:])
+
+def group_by_registrable_domain(domains: List[str]) -> "OrderedDict[str, List[str]]":
+    groups: "OrderedDict[str, List[str]]" = OrderedDict()
+    for domain in domains:
+        groups.setdefault(registrable_domain(domain) or domain, []).append(domain)
+    return groups
 
 def fetch_with_fallback(domain: str, path: str = "/", timeout: int = 20) -> Tuple[str, str, Dict]:
     user_agents = [
@@ -69,13 +163,153 @@ def fetch_with_fallback(domain: str, path: str = "/", timeout: int = 20) -> Tupl
         url = f"{proto}://{domain}{path}"
         for ua in user_agents:
             try:
-                resp = session.get(url, headers={"User-Agent": ua}, timeout=timeout, verify=False, allow_redirects=True)
+                with stage_slot("http"):
+                    resp = session.get(url, headers={"User-Agent": ua}, timeout=timeout, verify=False, allow_redirects=True)
                 if resp.status_code == 200:
                     return resp.text, url, dict(resp.headers)
+            except Overloaded:
+                raise
             except Exception:
                 continue
     return "", "", {}
 
+# ============================================================
+# 🚦 ADMISSION CONTROL
+# ============================================================
+
+class Overloaded(Exception):
+    """Raised when a limiter has no spare capacity."""
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit driven by the observed latency of each call.
+
+    Calls finishing under `target_latency` grow the limit by roughly one per
+    window of completions; a slower call, or one the caller flags as congested
+    (e.g. it finished fast only because downstream work was shed), shrinks it
+    by `backoff`, at most once per `target_latency` seconds so a burst of such
+    calls counts as one signal.
+    """
+
+    def __init__(self, name: str, initial: int, min_limit: int, max_limit: int,
+                 target_latency: float, backoff: float = 0.7):
+        self.name = name
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self.in_flight = 0
+        self.avg_latency = target_latency / 2
+        self.shed = 0
+        self._last_decrease = 0.0
+        self._lock = threading.Condition()
+
+    def try_acquire(self, timeout: float = 0, share: float = 1.0) -> bool:
+        """Take a slot, waiting up to `timeout` seconds for one to free up.
+
+        With `share` below 1 the caller only gets a slot while in-flight work stays
+        under that fraction of the limit, leaving the rest for full-share callers.
+        """
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while self.in_flight >= self._capacity(share):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.shed += 1
+                    return False
+                self._lock.wait(remaining)
+            self.in_flight += 1
+            return True
+
+    def has_capacity(self, share: float = 1.0) -> bool:
+        with self._lock:
+            return self.in_flight < self._capacity(share)
+
+    def _capacity(self, share: float) -> int:
+        if share >= 1.0:
+            return int(self.limit)
+        # A partial share still gets one slot, or it could never make progress
+        return max(1, int(self.limit * share))
+
+    def release(self, latency: float, congested: bool = False) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.avg_latency = 0.8 * self.avg_latency + 0.2 * latency
+            now = time.monotonic()
+            if congested or latency > self.target_latency:
+                if now - self._last_decrease >= self.target_latency:
+                    self.limit = max(self.min_limit, self.limit * self.backoff)
+                    self._last_decrease = now
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            # Waiters may hold different shares, so let each re-check its own threshold
+            self._lock.notify_all()
+
+    @contextmanager
+    def slot(self, timeout: float = 0, share: float = 1.0):
+        if not self.try_acquire(timeout, share):
+            raise Overloaded(self.name)
+        start = time.monotonic()
+        outcome = SimpleNamespace(congested=False)
+        try:
+            yield outcome
+        finally:
+            self.release(time.monotonic() - start, outcome.congested)
+
+    def retry_after(self) -> int:
+        return min(60, max(1, math.ceil(self.avg_latency)))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "avg_latency": round(self.avg_latency, 2),
+            "shed": self.shed
+        }
+
+AUDIT_LIMITER = AdaptiveLimiter("audit", initial=8, min_limit=1, max_limit=16, target_latency=30.0)
+
+# Sized so a full audit limit fits: one audit holds up to 4 HTTP slots (hosting,
+# technology, ads, performance), 2 DNS slots and 1 TLS slot at once
+STAGE_LIMITERS = {
+    "dns": AdaptiveLimiter("dns", initial=32, min_limit=4, max_limit=128, target_latency=2.0),
+    "whois": AdaptiveLimiter("whois", initial=8, min_limit=1, max_limit=32, target_latency=5.0),
+    "http": AdaptiveLimiter("http", initial=64, min_limit=8, max_limit=256, target_latency=10.0),
+    "tls": AdaptiveLimiter("tls", initial=16, min_limit=2, max_limit=64, target_latency=5.0)
+}
+
+# How long an admitted audit waits out a momentary stage spike before shedding
+# the call; kept well inside SECTION_TIMEOUT
+SECTION_TIMEOUT = 30
+STAGE_SLOT_WAIT = 2.0
+
+def stage_slot(name: str):
+    return STAGE_LIMITERS[name].slot(timeout=STAGE_SLOT_WAIT)
+
+# Last successful audit per domain, served when the audit limiter is saturated
+SERVE_STALE_ON_OVERLOAD = True
+STALE_CACHE_SIZE = 512
+STALE_CACHE_TTL = 6 * 3600
+_stale_cache: "OrderedDict[str, Tuple[float, datetime, Dict[str, Any]]]" = OrderedDict()
+_stale_cache_lock = threading.Lock()
+
+def remember_audit(domain: str, audited_at: datetime, audit_results: Dict[str, Any]) -> None:
+    # A partial audit is not worth serving later in place of a fresh one
+    if audit_results.get("skipped"):
+        return
+    with _stale_cache_lock:
+        _stale_cache[domain] = (time.monotonic(), audited_at, audit_results)
+        _stale_cache.move_to_end(domain)
+        while len(_stale_cache) > STALE_CACHE_SIZE:
+            _stale_cache.popitem(last=False)
+
+def recall_audit(domain: str) -> Optional[Tuple[datetime, Dict[str, Any]]]:
+    with _stale_cache_lock:
+        entry = _stale_cache.get(domain)
+        if not entry or time.monotonic() - entry[0] > STALE_CACHE_TTL:
+            return None
+        return entry[1], entry[2]
+
 # ============================================================
 # 🌐 DOMAIN & HOSTING SECTION
 # ============================================================
@@ -83,7 +317,8 @@ def fetch_with_fallback(domain: str, path: str = "/", timeout: int = 20) -> Tupl
 def get_whois_info(domain: str) -> Dict[str, Any]:
     info = {}
     try:
-        w = whois.whois(domain)
+        with stage_slot("whois"):
+            w = whois.whois(domain)
         
         if w.registrar:
             info["Registrar"] = w.registrar
@@ -104,10 +339,13 @@ def get_whois_info(domain: str) -> Dict[str, Any]:
                 expiry_dt = datetime.strptime(expiry_date, "%Y-%m-%d")
                 days_until_expiry = (expiry_dt - datetime.now()).days
                 info["Expiry Status"] = f"{days_until_expiry} days remaining"
+                info["_expiry_days"] = days_until_expiry
                 
         if w.name_servers:
             info["Nameservers"] = [ns.rstrip('.').upper() for ns in w.name_servers if ns]
             
+    except Overloaded:
+        raise
     except Exception as e:
         logger.debug(f"WHOIS failed: {e}")
     return info
@@ -140,10 +378,11 @@ def get_hosting_details(domain: str, nameservers: List[str] = None) -> Dict[str,
     data = {}
     try:
         # Get IP address
-        try:
-            ip = str(resolver.resolve(domain, "A")[0])
-        except:
-            ip = socket.gethostbyname(domain)
+        with stage_slot("dns"):
+            try:
+                ip = str(resolver.resolve(domain, "A")[0])
+            except:
+                ip = socket.gethostbyname(domain)
         data["IP Address"] = ip
         
         # Get server information from headers
@@ -158,6 +397,8 @@ def get_hosting_details(domain: str, nameservers: List[str] = None) -> Dict[str,
         if provider:
             data["Hosting Provider"] = provider
             
+    except Overloaded:
+        raise
     except Exception as e:
         logger.debug(f"Hosting lookup failed: {e}")
     return data
@@ -169,19 +410,23 @@ def get_hosting_details(domain: str, nameservers: List[str] = None) -> Dict[str,
 def get_mx_records(domain: str) -> List[str]:
     try:
         mx_records = []
-        for r in resolver.resolve(domain, "MX"):
+        with stage_slot("dns"):
+            answers = resolver.resolve(domain, "MX")
+        for r in answers:
             mx_records.append(str(r.exchange).rstrip(".").lower())
         return mx_records
-    except:
+    except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
         return []
 
 def get_txt_records(domain: str) -> List[str]:
     try:
         recs = []
-        for r in resolver.resolve(domain, "TXT"):
+        with stage_slot("dns"):
+            answers = resolver.resolve(domain, "TXT")
+        for r in answers:
             recs.append("".join([t.decode() if isinstance(t, bytes) else str(t) for t in r.strings]))
         return recs
-    except:
+    except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
         return []
 
 def detect_email_provider(mx_records: List[str]) -> str:
@@ -224,8 +469,17 @@ def check_spf(txt_records: List[str]) -> str:
 def get_email_setup(domain: str) -> Dict[str, Any]:
     email_info = {}
     
+    # A missing record is a finding; a failed lookup (timeout, SERVFAIL) is not
+    try:
+        mx_records = get_mx_records(domain)
+        txt_records = get_txt_records(domain)
+    except Overloaded:
+        raise
+    except Exception as e:
+        logger.debug(f"Email DNS lookup failed: {e}")
+        return email_info
+    
     # MX Records
-    mx_records = get_mx_records(domain)
     if mx_records:
         email_info["MX Records"] = mx_records
         email_info["Provider"] = detect_email_provider(mx_records)
@@ -234,9 +488,11 @@ def get_email_setup(domain: str) -> Dict[str, Any]:
         email_info["Provider"] = "No email service detected"
     
     # SPF Check
-    txt_records = get_txt_records(domain)
     email_info["SPF"] = check_spf(txt_records)
     
+    # Hosts share their zone's email section, so say which name was looked up
+    email_info["Resolved For"] = domain
+    
     return email_info
 
 # ============================================================
@@ -479,7 +735,7 @@ def audit_security(domain: str) -> Dict[str, Any]:
     
     try:
         ctx = ssl.create_default_context()
-        with socket.create_connection((domain, 443), timeout=10) as sock:
+        with stage_slot("tls"), socket.create_connection((domain, 443), timeout=10) as sock:
             with ctx.wrap_socket(sock, server_hostname=domain) as ssock:
                 cert = ssock.getpeercert()
                 if cert:
@@ -490,7 +746,11 @@ def audit_security(domain: str) -> Dict[str, Any]:
                     expiry = datetime.strptime(cert["notAfter"], '%b %d %H:%M:%S %Y %Z')
                     days_until_expiry = (expiry - datetime.utcnow()).days
                     security["Certificate Expiry"] = f"{expiry.strftime('%Y-%m-%d')} ({days_until_expiry} days remaining)"
+                    security["_cert_expiry"] = expiry
+                    security["_cert_days"] = days_until_expiry
                     
+    except Overloaded:
+        raise
     except Exception as e:
         logger.debug(f"SSL check failed: {e}")
     
@@ -595,8 +855,10 @@ def analyze_performance(domain: str) -> Dict[str, Any]:
         return performance
     
     # Calculate averages
-    avg_load_time = round(sum(load_times) / len(load_times), 2)
-    avg_page_size = round(sum(page_sizes) / len(page_sizes), 1)
+    performance["_load_time_s"] = sum(load_times) / len(load_times)
+    performance["_page_size_kb"] = sum(page_sizes) / len(page_sizes)
+    avg_load_time = round(performance["_load_time_s"], 2)
+    avg_page_size = round(performance["_page_size_kb"], 1)
     
     performance["Load Time"] = f"{avg_load_time}s"
     performance["Page Size"] = f"{avg_page_size} KB"
@@ -636,36 +898,394 @@ def analyze_performance(domain: str) -> Dict[str, Any]:
 # 🚀 PARALLEL RUNNER
 # ============================================================
 
-def run_parallel_audit(domain: str):
+# WHOIS and the zone's MX/SPF records only exist at the registrable domain, so these
+# sections run once per zone and are shared by every host audited under it.
+ZONE_SECTIONS = {
+    "whois": get_whois_info,
+    "email": get_email_setup
+}
+
+HOST_SECTIONS = {
+    "hosting": lambda domain: get_hosting_details(domain, []),
+    "technology": detect_cms_technology,
+    "security": audit_security,
+    "ads_analytics": detect_ads_analytics,
+    "performance": analyze_performance
+}
+
+ZONE_CACHE_SIZE = 1024
+ZONE_CACHE_TTL = 3600
+# Failed lookups (empty results) are cached briefly so waiting callers don't retry one by one
+ZONE_FAILURE_TTL = 60
+BULK_MAX_DOMAINS = 50
+BULK_MAX_ZONES_IN_PARALLEL = 4
+BULK_MAX_AUDITS_IN_PARALLEL = 8
+BULK_SLOT_WAIT = 30.0
+# Bulk work may fill at most this fraction of AUDIT_LIMITER, keeping room for single audits
+BULK_AUDIT_SHARE = 0.5
+# No new zone or host audit starts this many seconds after a bulk request began
+BULK_DEADLINE = 120.0
+BUSY_ERROR = "Server is busy, please retry later"
+BULK_AUDIT_FAILED_ERROR = "Domain audit failed"
+_zone_cache: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_zone_cache_lock = threading.Lock()
+_zone_inflight: Dict[Tuple[str, str], threading.Lock] = {}
+
+def _cached_zone_section(key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+    entry = _zone_cache.get(key)
+    if entry and time.monotonic() - entry[0] <= (ZONE_CACHE_TTL if entry[1] else ZONE_FAILURE_TTL):
+        return entry[1]
+    return None
+
+def get_zone_section(name: str, zone: str) -> Dict[str, Any]:
+    """Run a zone-level section, sharing the result between concurrent and recent callers."""
+    key = (name, zone)
+    with _zone_cache_lock:
+        cached = _cached_zone_section(key)
+        if cached is not None:
+            return cached
+        inflight = _zone_inflight.setdefault(key, threading.Lock())
+    
+    with inflight:
+        with _zone_cache_lock:
+            cached = _cached_zone_section(key)
+        if cached is not None:
+            return cached
+        
+        try:
+            result = ZONE_SECTIONS[name](zone)
+            with _zone_cache_lock:
+                _zone_cache[key] = (time.monotonic(), result)
+                _zone_cache.move_to_end(key)
+                while len(_zone_cache) > ZONE_CACHE_SIZE:
+                    _zone_cache.popitem(last=False)
+        finally:
+            # Overloaded is not cached: the zone itself is fine, the next caller may retry
+            with _zone_cache_lock:
+                _zone_inflight.pop(key, None)
+    return result
+
+def run_zone_audit(zone: str) -> Dict[str, Dict[str, Any]]:
     results = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(ZONE_SECTIONS)) as executor:
+        futures = {name: executor.submit(get_zone_section, name, zone) for name in ZONE_SECTIONS}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result(timeout=SECTION_TIMEOUT)
+            except Overloaded:
+                # Left out so each host's own audit retries the section
+                logger.debug(f"{name} skipped for zone {zone}: overloaded")
+            except Exception as e:
+                logger.debug(f"{name} audit failed for zone {zone}: {e}")
+                results[name] = {}
+    return results
+
+def run_parallel_audit(domain: str, zone_results: Optional[Dict[str, Dict[str, Any]]] = None):
+    """Run every section for `domain`; sections shed by a saturated limiter come back empty and are listed under "skipped"."""
+    results = dict(zone_results or {})
+    skipped = []
+    zone = registrable_domain(domain) or domain
     
-    with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-        # Start all audits in parallel
-        futures = {
-            "whois": executor.submit(get_whois_info, domain),
-            "hosting": executor.submit(get_hosting_details, domain, []),
-            "email": executor.submit(get_email_setup, domain),
-            "technology": executor.submit(detect_cms_technology, domain),
-            "security": executor.submit(audit_security, domain),
-            "ads_analytics": executor.submit(detect_ads_analytics, domain),
-            "performance": executor.submit(analyze_performance, domain)
-        }
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(ZONE_SECTIONS) + len(HOST_SECTIONS)) as executor:
+        # Start all audits in parallel, reusing zone-level results when the caller already has them
+        futures = {name: executor.submit(get_zone_section, name, zone) for name in ZONE_SECTIONS if name not in results}
+        futures.update({name: executor.submit(section, domain) for name, section in HOST_SECTIONS.items()})
         
         # Collect results
         for name, future in futures.items():
             try:
-                results[name] = future.result(timeout=30)
+                results[name] = future.result(timeout=SECTION_TIMEOUT)
+            except Overloaded as e:
+                logger.debug(f"{name} audit skipped: {e} limiter saturated")
+                results[name] = {}
+                skipped.append(name)
             except Exception as e:
                 logger.debug(f"{name} audit failed: {e}")
                 results[name] = {}
     
     # Update hosting with nameservers from whois for better provider detection
-    if "whois" in results and "Nameservers" in results["whois"]:
+    if "whois" in results and "Nameservers" in results["whois"] and "hosting" not in skipped:
         nameservers = results["whois"]["Nameservers"]
-        results["hosting"] = get_hosting_details(domain, nameservers)
+        try:
+            results["hosting"] = get_hosting_details(domain, nameservers)
+        except Overloaded:
+            pass
+    
+    results["skipped"] = skipped
+    return results
+
+def run_bulk_audit(domains: List[str]) -> Dict[str, Union[Dict[str, Any], str]]:
+    """Audit `domains` grouped by registrable domain so each zone's sections run once per group.
+
+    Each zone audit and each host audit takes its own AUDIT_LIMITER slot, limited
+    to BULK_AUDIT_SHARE of the limit and waiting up to BULK_SLOT_WAIT seconds for
+    one. Nothing new starts after BULK_DEADLINE. Hosts that never get a slot or
+    whose audit fails map to an error message instead of results.
+    """
+    deadline = time.monotonic() + BULK_DEADLINE
+    
+    def bulk_slot():
+        wait = min(BULK_SLOT_WAIT, deadline - time.monotonic())
+        if wait <= 0:
+            raise Overloaded("bulk deadline")
+        return AUDIT_LIMITER.slot(timeout=wait, share=BULK_AUDIT_SHARE)
+    
+    def audit_zone(zone: str) -> Dict[str, Dict[str, Any]]:
+        try:
+            with bulk_slot() as outcome:
+                zone_results = run_zone_audit(zone)
+                outcome.congested = len(zone_results) < len(ZONE_SECTIONS)
+                return zone_results
+        except Overloaded:
+            # Hosts in the zone fetch whatever is missing inside their own slots
+            return {}
+    
+    groups = group_by_registrable_domain(domains)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=BULK_MAX_ZONES_IN_PARALLEL) as executor:
+        zone_results = dict(zip(groups, executor.map(audit_zone, groups)))
+    
+    def audit_host(host: str, zone: str) -> Union[Dict[str, Any], str]:
+        try:
+            with bulk_slot() as outcome:
+                audit_results = run_parallel_audit(host, zone_results[zone])
+                outcome.congested = bool(audit_results["skipped"])
+                return audit_results
+        except Overloaded as e:
+            logger.debug(f"Bulk audit of {host} shed: {e}")
+            return BUSY_ERROR
+    
+    results = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=BULK_MAX_AUDITS_IN_PARALLEL) as executor:
+        futures = {host: executor.submit(audit_host, host, zone) for zone, hosts in groups.items() for host in hosts}
+        for host, future in futures.items():
+            try:
+                results[host] = future.result()
+            except Exception as e:
+                logger.warning(f"Bulk audit failed for {host}: {e}")
+                results[host] = BULK_AUDIT_FAILED_ERROR
     
     return results
 
+# ============================================================
+# 📦 RESPONSE FORMATS
+# ============================================================
+
+COMPACT_SCHEMA_VERSION = 1
+MIN_COMPRESS_BYTES = 1024
+RESPONSE_FORMATS = ("full", "compact", "msgpack")
+
+def _snake_keys(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {re.sub(r"[^a-z0-9]+", "_", k.lower()).strip("_"): v for k, v in data.items()}
+
+def _single_str(value: Any) -> Optional[str]:
+    # python-whois returns a list when the registry reports several values
+    if isinstance(value, (list, tuple)):
+        value = next((v for v in value if v), None)
+    return str(value) if value else None
+
+def compact_whois(info: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "registrar": _single_str(info.get("Registrar")),
+        "created": info.get("Created"),
+        "expiry": info.get("Expiry"),
+        "expiry_days": info.get("_expiry_days"),
+        "nameservers": info.get("Nameservers", [])
+    }
+
+def compact_hosting(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "ip": data.get("IP Address"),
+        "web_server": data.get("Web Server"),
+        "provider": data.get("Hosting Provider")
+    }
+
+def compact_email(email_info: Dict[str, Any]) -> Dict[str, Any]:
+    mx_records = email_info.get("MX Records")
+    provider = email_info.get("Provider")
+    spf = email_info.get("SPF")
+    return {
+        "mx": mx_records if isinstance(mx_records, list) else [],
+        "provider": None if provider == "No email service detected" else provider,
+        "spf": spf.lower().replace(" ", "_") if spf else None,
+        "zone": email_info.get("Resolved For")
+    }
+
+def compact_technology(tech_data: Dict[str, Any]) -> Dict[str, Any]:
+    cms = tech_data.get("CMS")
+    return {
+        "cms": None if cms in (None, "Not Detected") else cms,
+        "version": tech_data.get("Version"),
+        "theme": tech_data.get("Theme"),
+        "plugins": tech_data.get("Plugins", []),
+        "tools": {"analytics": [], "marketing": [], "cdn": [], "javascript": [], "css": [], **_snake_keys(tech_data.get("Tools", {}))}
+    }
+
+def compact_security(security: Dict[str, Any]) -> Dict[str, Any]:
+    tls_version = security.get("TLS Version")
+    cert_expiry = security.get("_cert_expiry")
+    return {
+        "ssl_valid": security.get("SSL Certificate") == "Valid",
+        "tls_version": None if tls_version in (None, "Unknown") else tls_version,
+        "cert_expiry": cert_expiry.strftime("%Y-%m-%d") if cert_expiry else None,
+        "cert_days": security.get("_cert_days")
+    }
+
+def compact_ads_analytics(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {"analytics": [], "ad_networks": [], "marketing_tools": [], **_snake_keys(data)}
+
+def compact_performance(performance: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "loaded": performance.get("_load_time_s") is not None,
+        "load_time_s": performance.get("_load_time_s"),
+        "page_size_kb": performance.get("_page_size_kb"),
+        "rating": performance.get("Rating"),
+        "grade": performance.get("Grade"),
+        "insights": performance.get("Insights", [])
+    }
+
+COMPACT_SECTIONS = {
+    "whois": compact_whois,
+    "hosting": compact_hosting,
+    "email": compact_email,
+    "technology": compact_technology,
+    "security": compact_security,
+    "ads_analytics": compact_ads_analytics,
+    "performance": compact_performance
+}
+
+def build_compact_response(domain: str, audit_results: Dict[str, Any], audited_at: datetime, elapsed: float) -> Dict[str, Any]:
+    payload = {
+        "v": COMPACT_SCHEMA_VERSION,
+        "domain": domain,
+        "zone": registrable_domain(domain),
+        "audited_at": audited_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "processing_ms": int(elapsed * 1000)
+    }
+    skipped = audit_results.get("skipped", [])
+    for name, compact in COMPACT_SECTIONS.items():
+        payload[name] = None if name in skipped else compact(audit_results.get(name, {}))
+    payload["skipped"] = list(skipped)
+    return payload
+
+def project_fields(payload: Dict[str, Any], fields: str) -> Dict[str, Any]:
+    """Keep only the comma-separated dotted paths in `fields` (e.g. "whois.expiry_days,security")."""
+    projected = {"v": payload["v"], "domain": payload["domain"]}
+    for path in filter(None, (f.strip() for f in fields.split(","))):
+        parts = path.split(".")
+        value, found = payload, True
+        for part in parts:
+            if not isinstance(value, dict) or part not in value:
+                found = False
+                break
+            value = value[part]
+        if not found:
+            continue
+        target = projected
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+        target[parts[-1]] = value
+    return projected
+
+def dump_json(payload: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def negotiate_encoding(header: str) -> Optional[str]:
+    """Pick the supported content coding with the highest q-value in Accept-Encoding, or None for identity."""
+    qvalues = {}
+    for token in header.split(","):
+        name, *params = [part.strip() for part in token.strip().lower().split(";")]
+        if not name:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qvalues[name] = q
+    
+    # Listed in order of preference when the client weights codings equally
+    supported = (["br"] if brotli is not None else []) + ["gzip"]
+    best, best_q = None, 0.0
+    for coding in supported:
+        q = qvalues.get(coding, qvalues.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+def render_audit(body: bytes, media_type: str, request: Request, headers: Optional[Dict[str, str]] = None) -> Response:
+    headers = {"Vary": "Accept-Encoding", **(headers or {})}
+    if len(body) >= MIN_COMPRESS_BYTES:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+        if encoding == "br":
+            body = brotli.compress(body, quality=5)
+        elif encoding == "gzip":
+            body = gzip.compress(body, compresslevel=6)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=media_type, headers=headers)
+
+SECTION_TITLES = {
+    "whois": "🏷️ Domain Information",
+    "hosting": "🌐 Hosting Details",
+    "email": "📧 Email Setup",
+    "technology": "🛠️ Built With",
+    "security": "🔐 Security",
+    "ads_analytics": "📊 Ads & Analytics",
+    "performance": "⚡ Performance"
+}
+
+def display_fields(section: Dict[str, Any]) -> Dict[str, Any]:
+    # Underscore keys hold the typed values the compact format is built from
+    return {k: v for k, v in section.items() if not k.startswith("_")}
+
+def build_audit_payload(
+    domain: str,
+    audit_results: Dict[str, Any],
+    audited_at: datetime,
+    elapsed: float,
+    response_format: str,
+    fields: Optional[str]
+) -> Dict[str, Any]:
+    if response_format != "full":
+        payload = build_compact_response(domain, audit_results, audited_at, elapsed)
+        return project_fields(payload, fields) if fields else payload
+    
+    # Structure the final response with clean sections
+    return {
+        "Domain": domain,
+        "Registrable Domain": registrable_domain(domain),
+        "Audit Time": audited_at.strftime("%Y-%m-%d %H:%M:%S UTC"),
+        "Processing Time": f"{round(elapsed, 2)}s",
+        "Results": {title: display_fields(audit_results.get(name, {})) for name, title in SECTION_TITLES.items()},
+        "Skipped Sections": audit_results.get("skipped", [])
+    }
+
+def render_payload(payload: Dict[str, Any], response_format: str, request: Request, headers: Optional[Dict[str, str]] = None) -> Response:
+    if response_format == "msgpack":
+        return render_audit(msgpack.packb(payload, use_bin_type=True), "application/msgpack", request, headers)
+    return render_audit(dump_json(payload), "application/json", request, headers)
+
+def check_format_params(response_format: str, fields: Optional[str]) -> Optional[JSONResponse]:
+    if response_format not in RESPONSE_FORMATS:
+        return JSONResponse({"error": f"Unsupported format, expected one of: {', '.join(RESPONSE_FORMATS)}"}, status_code=400)
+    if fields and response_format == "full":
+        return JSONResponse({"error": "fields requires format=compact or format=msgpack"}, status_code=400)
+    if response_format == "msgpack" and msgpack is None:
+        return JSONResponse({"error": "MessagePack support is not installed"}, status_code=501)
+    return None
+
+def overloaded_response() -> JSONResponse:
+    return JSONResponse(
+        {"error": BUSY_ERROR},
+        status_code=429,
+        headers={"Retry-After": str(AUDIT_LIMITER.retry_after())}
+    )
+
 # ============================================================
 # 🧩 ROUTES
 # ============================================================
@@ -674,35 +1294,97 @@ def run_parallel_audit(domain: str):
 def home():
     return {"message": "Domain Audit API v12.0", "status": "running"}
 
+class BulkAuditRequest(BaseModel):
+    domains: List[str]
+
+@app.post("/audit/bulk")
+def audit_bulk(
+    body: BulkAuditRequest,
+    request: Request,
+    response_format: str = Query("full", alias="format"),
+    fields: Optional[str] = None
+):
+    start_time = time.time()
+    error = check_format_params(response_format, fields)
+    if error:
+        return error
+    if not body.domains or len(body.domains) > BULK_MAX_DOMAINS:
+        return JSONResponse({"error": f"Provide between 1 and {BULK_MAX_DOMAINS} domains"}, status_code=400)
+    
+    normalized = list(OrderedDict.fromkeys(normalize_domain(d) for d in body.domains))
+    valid = [d for d in normalized if is_valid_domain(d)]
+    
+    try:
+        if not AUDIT_LIMITER.has_capacity(BULK_AUDIT_SHARE):
+            logger.warning(f"Overloaded, shedding bulk audit of {len(valid)} domains")
+            return overloaded_response()
+        
+        logger.info(f"Bulk auditing {len(valid)} domains")
+        bulk_results = run_bulk_audit(valid)
+        if valid and all(bulk_results[d] == BUSY_ERROR for d in valid):
+            logger.warning(f"Overloaded, shed every host of a bulk audit of {len(valid)} domains")
+            return overloaded_response()
+        
+        audited_at = datetime.utcnow()
+        elapsed = time.time() - start_time
+        results = []
+        for domain in normalized:
+            if domain not in bulk_results:
+                results.append({"domain": domain, "error": "Invalid domain format"})
+                continue
+            if isinstance(bulk_results[domain], str):
+                # Failed or shed hosts are reported, never remembered as stale results
+                results.append({"domain": domain, "error": bulk_results[domain]})
+                continue
+            remember_audit(domain, audited_at, bulk_results[domain])
+            results.append(build_audit_payload(domain, bulk_results[domain], audited_at, elapsed, response_format, fields))
+        
+        if response_format == "full":
+            payload = {"Processing Time": f"{round(elapsed, 2)}s", "Results": results}
+        else:
+            payload = {"v": COMPACT_SCHEMA_VERSION, "processing_ms": int(elapsed * 1000), "results": results}
+        return render_payload(payload, response_format, request)
+        
+    except Exception as e:
+        logger.exception(f"Bulk audit failed: {e}")
+        return JSONResponse({"error": "Bulk audit failed"}, status_code=500)
+
 @app.get("/audit/{domain}")
-def audit_domain(domain: str):
+def audit_domain(
+    domain: str,
+    request: Request,
+    response_format: str = Query("full", alias="format"),
+    fields: Optional[str] = None
+):
     start_time = time.time()
     normalized_domain = normalize_domain(domain)
     
-    if len(normalized_domain) < 3 or not re.match(r'^[a-z0-9.-]+\.[a-z]{2,}$', normalized_domain):
+    if not is_valid_domain(normalized_domain):
         return JSONResponse({"error": "Invalid domain format"}, status_code=400)
+    error = check_format_params(response_format, fields)
+    if error:
+        return error
     
     try:
-        logger.info(f"Auditing {normalized_domain}")
-        audit_results = run_parallel_audit(normalized_domain)
-        
-        # Structure the final response with clean sections
-        final_response = {
-            "Domain": normalized_domain,
-            "Audit Time": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC"),
-            "Processing Time": f"{round(time.time() - start_time, 2)}s",
-            "Results": {
-                "🏷️ Domain Information": audit_results.get("whois", {}),
-                "🌐 Hosting Details": audit_results.get("hosting", {}),
-                "📧 Email Setup": audit_results.get("email", {}),
-                "🛠️ Built With": audit_results.get("technology", {}),
-                "🔐 Security": audit_results.get("security", {}),
-                "📊 Ads & Analytics": audit_results.get("ads_analytics", {}),
-                "⚡ Performance": audit_results.get("performance", {})
-            }
-        }
+        try:
+            with AUDIT_LIMITER.slot() as outcome:
+                logger.info(f"Auditing {normalized_domain}")
+                audit_results = run_parallel_audit(normalized_domain)
+                outcome.congested = bool(audit_results["skipped"])
+        except Overloaded:
+            cached = recall_audit(normalized_domain) if SERVE_STALE_ON_OVERLOAD else None
+            if not cached:
+                logger.warning(f"Overloaded, shedding audit for {normalized_domain}")
+                return overloaded_response()
+            logger.warning(f"Overloaded, serving cached audit for {normalized_domain}")
+            audited_at, audit_results = cached
+            payload = build_audit_payload(normalized_domain, audit_results, audited_at, time.time() - start_time, response_format, fields)
+            return render_payload(payload, response_format, request, headers={"X-Audit-Cache": "stale"})
         
-        return JSONResponse(final_response)
+        audited_at = datetime.utcnow()
+        remember_audit(normalized_domain, audited_at, audit_results)
+        payload = build_audit_payload(normalized_domain, audit_results, audited_at, time.time() - start_time, response_format, fields)
+        return render_payload(payload, response_format, request)
         
     except Exception as e:
         logger.exception(f"Audit failed for {domain}: {e}")
@@ -710,7 +1392,14 @@ def audit_domain(domain: str):
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy", "timestamp": datetime.utcnow().isoformat()}
+    return {
+        "status": "healthy",
+        "timestamp": datetime.utcnow().isoformat(),
+        "limits": {
+            "audit": AUDIT_LIMITER.snapshot(),
+            **{name: limiter.snapshot() for name, limiter in STAGE_LIMITERS.items()}
+        }
+    }
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,180 @@
+import http.server
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+import urllib.parse
+from types import SimpleNamespace
+
+import dns.message
+import dns.rdatatype
+import dns.resolver
+import dns.rrset
+import pytest
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+# Stand-ins for DNS, WHOIS, HTTP and TLS that answer after DEPENDENCY_DELAY seconds
+
+DEPENDENCY_DELAY = 0.15
+
+
+def slow_resolve(domain, rdtype):
+    time.sleep(DEPENDENCY_DELAY)
+    if rdtype == "A":
+        return ["127.0.0.1"]
+    if rdtype == "MX":
+        return [SimpleNamespace(exchange=f"mx.{domain}.")]
+    return [SimpleNamespace(strings=[b"v=spf1 -all"])]
+
+
+def slow_whois(domain):
+    time.sleep(DEPENDENCY_DELAY)
+    return SimpleNamespace(registrar="Stand-in Registrar", creation_date=None, expiration_date=None, name_servers=None)
+
+
+def slow_get(url, **kwargs):
+    time.sleep(DEPENDENCY_DELAY)
+    return SimpleNamespace(status_code=200, text="<html>wp-content</html>", headers={"Server": "nginx"})
+
+
+def slow_connect(address, timeout=None):
+    time.sleep(DEPENDENCY_DELAY)
+    raise ConnectionRefusedError("stand-in TLS server refuses connections")
+
+
+@pytest.fixture
+def stand_ins(monkeypatch):
+    monkeypatch.setattr(main.resolver, "resolve", slow_resolve)
+    monkeypatch.setattr(main.whois, "whois", slow_whois)
+    monkeypatch.setattr(main.session, "get", slow_get)
+    monkeypatch.setattr(main.socket, "create_connection", slow_connect)
+    monkeypatch.setattr(main, "AUDIT_LIMITER", main.AdaptiveLimiter("audit", initial=4, min_limit=1, max_limit=8, target_latency=0.2))
+    for name in main.STAGE_LIMITERS:
+        monkeypatch.setitem(main.STAGE_LIMITERS, name, main.AdaptiveLimiter(name, initial=64, min_limit=4, max_limit=128, target_latency=0.05))
+    monkeypatch.setattr(main, "STAGE_SLOT_WAIT", 0.05)
+    monkeypatch.setattr(main, "_stale_cache", main.OrderedDict())
+    monkeypatch.setattr(main, "_zone_cache", main.OrderedDict())
+    return main.AUDIT_LIMITER
+
+
+@pytest.fixture
+def whois_calls(stand_ins, monkeypatch):
+    """Names the stand-in WHOIS was queried for, in call order."""
+    calls = []
+
+    def recording_whois(domain):
+        calls.append(domain)
+        return slow_whois(domain)
+
+    monkeypatch.setattr(main.whois, "whois", recording_whois)
+    return calls
+
+
+# Local stand-in services reached over real sockets: an HTTP server behind the
+# app's own Retry-mounted session, a UDP DNS server behind a real resolver and a
+# TCP listener standing in for port 443. python-whois dials fixed port-43 hosts,
+# so WHOIS stays the in-process stand-in above.
+
+SERVICE_DELAY = 0.1
+
+
+class _StandInHTTPHandler(http.server.BaseHTTPRequestHandler):
+    server_version = "nginx/1.25"
+    sys_version = ""
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            # Every fifth request fails once so the Retry path inside the http slot runs
+            fail = server.requests % 5 == 0
+            server.failures += fail
+        time.sleep(SERVICE_DELAY)
+        body = b"<html><head></head><body>wp-content googletagmanager.com</body></html>"
+        self.send_response(503 if fail else 200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _StandInDNSHandler(socketserver.BaseRequestHandler):
+    RECORDS = {"A": "127.0.0.1", "MX": "10 mx.{name}", "TXT": '"v=spf1 -all"'}
+
+    def handle(self):
+        data, sock = self.request
+        query = dns.message.from_wire(data)
+        question = query.question[0]
+        rdtype = dns.rdatatype.to_text(question.rdtype)
+        response = dns.message.make_response(query)
+        if rdtype in self.RECORDS:
+            text = self.RECORDS[rdtype].format(name=question.name.to_text())
+            response.answer.append(dns.rrset.from_text(question.name, 300, "IN", rdtype, text))
+        time.sleep(SERVICE_DELAY / 2)
+        sock.sendto(response.to_wire(), self.client_address)
+
+
+class _StandInTLSHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        time.sleep(SERVICE_DELAY)
+
+
+class _LocalAdapter(requests.adapters.HTTPAdapter):
+    """Send every request to the stand-in HTTP server, whatever host it names."""
+
+    def __init__(self, address, **kwargs):
+        self.address = address
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        path = urllib.parse.urlsplit(request.url)
+        request.url = urllib.parse.urlunsplit(("http", self.address, path.path, path.query, ""))
+        return super().send(request, **kwargs)
+
+
+def _serve(server):
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def local_services(stand_ins, monkeypatch):
+    http_server = _serve(http.server.ThreadingHTTPServer(("127.0.0.1", 0), _StandInHTTPHandler))
+    http_server.lock, http_server.requests, http_server.failures = threading.Lock(), 0, 0
+    dns_server = _serve(socketserver.ThreadingUDPServer(("127.0.0.1", 0), _StandInDNSHandler))
+    tls_server = _serve(socketserver.ThreadingTCPServer(("127.0.0.1", 0), _StandInTLSHandler))
+
+    session = requests.Session()
+    # Same Retry policy as production, minus the multi-second backoff between attempts
+    adapter = _LocalAdapter("127.0.0.1:%d" % http_server.server_address[1], max_retries=main.retries.new(backoff_factor=0))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    monkeypatch.setattr(main, "session", session)
+
+    resolver = dns.resolver.Resolver(configure=False)
+    resolver.nameservers = ["127.0.0.1"]
+    resolver.port = dns_server.server_address[1]
+    resolver.timeout = resolver.lifetime = 2
+    monkeypatch.setattr(main, "resolver", resolver)
+
+    create_connection = socket.create_connection
+
+    def connect_tls_stand_in(address, *args, **kwargs):
+        if address[1] == 443:
+            address = tls_server.server_address
+        return create_connection(address, *args, **kwargs)
+
+    monkeypatch.setattr(main.socket, "create_connection", connect_tls_stand_in)
+    yield SimpleNamespace(http=http_server, dns=dns_server, tls=tls_server)
+    for server in (http_server, dns_server, tls_server):
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,119 @@
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+import main
+
+
+def test_bulk_shares_zone_work_and_runs_hosts_concurrently(stand_ins, whois_calls, monkeypatch):
+    stand_ins.limit = stand_ins.max_limit = 6
+    stand_ins.target_latency = 60.0
+
+    running, peak, lock = [0], [0], threading.Lock()
+    run_parallel_audit = main.run_parallel_audit
+
+    def tracked(domain, zone_results=None):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        try:
+            assert stand_ins.in_flight <= int(stand_ins.limit * main.BULK_AUDIT_SHARE)
+            return run_parallel_audit(domain, zone_results)
+        finally:
+            with lock:
+                running[0] -= 1
+
+    monkeypatch.setattr(main, "run_parallel_audit", tracked)
+    hosts = [f"shop{i}.example.co.uk" for i in range(6)] + ["example.co.uk", "blog.test.com", "co.uk"]
+    response = TestClient(main.app).post("/audit/bulk?format=compact&fields=whois.registrar", json={"domains": hosts})
+
+    assert response.status_code == 200
+    results = {r["domain"]: r for r in response.json()["results"]}
+    assert results["co.uk"]["error"] == "Invalid domain format"
+    assert results["shop3.example.co.uk"]["whois"]["registrar"] == "Stand-in Registrar"
+    assert sorted(whois_calls) == ["example.co.uk", "test.com"]
+    # Hosts of one zone overlap, but never beyond bulk's share of the audit limit
+    assert peak[0] == 3
+    assert stand_ins.in_flight == 0
+
+
+def test_bulk_host_latency_not_batch_latency_drives_limiter(stand_ins):
+    # One host audit takes well under the target, the whole batch well over it
+    stand_ins.target_latency = 2.0
+    for limiter in main.STAGE_LIMITERS.values():
+        limiter.target_latency = 60.0
+    limit_before = stand_ins.limit
+    started = time.monotonic()
+    response = TestClient(main.app).post("/audit/bulk", json={"domains": [f"h{i}.example.com" for i in range(24)]})
+    assert response.status_code == 200
+    assert time.monotonic() - started > stand_ins.target_latency
+    assert stand_ins.avg_latency < stand_ins.target_latency
+    assert stand_ins.limit > limit_before
+
+
+def test_bulk_is_shed_when_audit_limiter_is_full(stand_ins):
+    stand_ins.limit = 1
+    stand_ins.try_acquire()
+    try:
+        response = TestClient(main.app).post("/audit/bulk", json={"domains": ["example.com"]})
+    finally:
+        stand_ins.release(0)
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+
+
+def test_single_audits_keep_their_share_during_bulk(stand_ins, monkeypatch):
+    stand_ins.limit = stand_ins.max_limit = 4
+    stand_ins.target_latency = 60.0
+    client = TestClient(main.app)
+    zone_slots = []
+    run_zone_audit = main.run_zone_audit
+
+    def tracked_zone_audit(zone):
+        zone_slots.append(stand_ins.in_flight)
+        return run_zone_audit(zone)
+
+    monkeypatch.setattr(main, "run_zone_audit", tracked_zone_audit)
+    bulk = threading.Thread(target=client.post, args=("/audit/bulk",), kwargs={"json": {"domains": [f"h{i}.example.com" for i in range(12)]}})
+    bulk.start()
+    time.sleep(0.2)
+    singles = [client.get(f"/audit/single{i}.org") for i in range(4)]
+    bulk.join()
+
+    assert [r.status_code for r in singles] == [200] * 4
+    # Zone work ran inside an audit slot too
+    assert zone_slots and all(n >= 1 for n in zone_slots)
+
+
+def test_bulk_stops_starting_work_after_deadline(stand_ins, monkeypatch):
+    monkeypatch.setattr(main, "BULK_DEADLINE", 1.5)
+    monkeypatch.setattr(main, "BULK_MAX_AUDITS_IN_PARALLEL", 1)
+    stand_ins.limit = stand_ins.max_limit = 2
+    stand_ins.target_latency = 60.0
+    started = time.monotonic()
+    response = TestClient(main.app).post("/audit/bulk?format=compact", json={"domains": [f"h{i}.example.com" for i in range(20)]})
+    assert response.status_code == 200
+    assert time.monotonic() - started < main.BULK_DEADLINE + 3.0
+    results = response.json()["results"]
+    busy = [r for r in results if r.get("error") == "Server is busy, please retry later"]
+    assert busy and len(busy) < len(results)
+
+
+def test_failed_host_is_reported_and_never_cached(stand_ins, monkeypatch):
+    run_parallel_audit = main.run_parallel_audit
+
+    def flaky(domain, zone_results=None):
+        if domain == "broken.example.com":
+            raise RuntimeError("boom")
+        return run_parallel_audit(domain, zone_results)
+
+    monkeypatch.setattr(main, "run_parallel_audit", flaky)
+    response = TestClient(main.app).post("/audit/bulk?format=compact", json={"domains": ["broken.example.com", "fine.example.com"]})
+
+    assert response.status_code == 200
+    results = {r["domain"]: r for r in response.json()["results"]}
+    assert results["broken.example.com"] == {"domain": "broken.example.com", "error": "Domain audit failed"}
+    assert results["fine.example.com"]["whois"]["registrar"] == "Stand-in Registrar"
+    assert "broken.example.com" not in main._stale_cache
+    assert "fine.example.com" in main._stale_cache
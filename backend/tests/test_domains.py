@@ -0,0 +1,61 @@
+import pytest
+
+import main
+
+
+@pytest.mark.parametrize("domain, expected", [
+    ("example.com", "example.com"),
+    ("a.b.example.com", "example.com"),
+    ("example.co.uk", "example.co.uk"),
+    ("shop.example.co.uk", "example.co.uk"),
+    # *.ck wildcard, with !www.ck as its exception
+    ("foo.bar.ck", "foo.bar.ck"),
+    ("deep.foo.bar.ck", "foo.bar.ck"),
+    ("www.ck", "www.ck"),
+    # *.kawasaki.jp wildcard, with !city.kawasaki.jp as its exception
+    ("city.kawasaki.jp", "city.kawasaki.jp"),
+    ("www.city.kawasaki.jp", "city.kawasaki.jp"),
+    ("shop.foo.kawasaki.jp", "shop.foo.kawasaki.jp"),
+    # Private suffixes are deliberately not applied
+    ("x.blogspot.com", "blogspot.com"),
+    ("example.xn--p1ai", "example.xn--p1ai"),
+    # Unknown TLDs fall back to the implicit "*" rule
+    ("test.unknowntld", "test.unknowntld"),
+])
+def test_registrable_domain(domain, expected):
+    assert main.registrable_domain(domain) == expected
+
+
+@pytest.mark.parametrize("domain", ["com", "co.uk", "uk", "bar.ck", "foo.kawasaki.jp", "xn--p1ai"])
+def test_bare_public_suffix_has_no_registrable_domain(domain):
+    assert main.registrable_domain(domain) is None
+    assert not main.is_valid_domain(domain)
+
+
+@pytest.mark.parametrize("domain", ["a..com", ".example.com", "example..co.uk", "example.com..", "..com"])
+def test_empty_labels_are_rejected(domain):
+    assert main.registrable_domain(domain) is None
+    assert not main.is_valid_domain(domain)
+
+
+def test_normalize_empty_label_stays_invalid():
+    assert not main.is_valid_domain(main.normalize_domain("a..com"))
+
+
+def test_normalize_idn_and_trailing_dot():
+    assert main.normalize_domain("https://www.Пример.рф/path") == "xn--e1afmkfd.xn--p1ai"
+    assert main.registrable_domain(main.normalize_domain("почта.пример.рф")) == "xn--e1afmkfd.xn--p1ai"
+    assert main.normalize_domain("Example.CO.UK.") == "example.co.uk"
+    assert main.normalize_domain("http://shop.example.co.uk.:8080/x") == "shop.example.co.uk"
+    assert main.is_valid_domain(main.normalize_domain("пример.рф"))
+
+
+def test_group_by_registrable_domain():
+    groups = main.group_by_registrable_domain([
+        "a.example.co.uk", "b.test.com", "example.co.uk", "test.com", "foo.bar.ck"
+    ])
+    assert list(groups.items()) == [
+        ("example.co.uk", ["a.example.co.uk", "example.co.uk"]),
+        ("test.com", ["b.test.com", "test.com"]),
+        ("foo.bar.ck", ["foo.bar.ck"])
+    ]
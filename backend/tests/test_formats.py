@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import main
+
+
+def test_compact_performance_from_real_output(monkeypatch):
+    monkeypatch.setattr(main, "fetch_with_fallback", lambda domain: ("x" * 2100, "https://example.com/", {}))
+    performance = main.analyze_performance("example.com")
+    compact = main.compact_performance(performance)
+    assert compact["loaded"] is True
+    assert isinstance(compact["load_time_s"], float)
+    # Typed values keep full precision; only the display string is rounded
+    assert compact["page_size_kb"] == 2100 / 1024
+    assert performance["Page Size"] == "2.1 KB"
+    assert compact["rating"] == "A+"
+
+
+def test_full_format_hides_typed_values(monkeypatch):
+    monkeypatch.setattr(main, "fetch_with_fallback", lambda domain: ("x" * 2100, "https://example.com/", {}))
+    audit_results = {"performance": main.analyze_performance("example.com"), "skipped": []}
+    payload = main.build_audit_payload("example.com", audit_results, datetime(2026, 1, 1), 1.0, "full", None)
+    section = payload["Results"]["⚡ Performance"]
+    assert section["Page Size"] == "2.1 KB"
+    assert not [k for k in section if k.startswith("_")]
+
+
+def test_compact_performance_failed_load(monkeypatch):
+    monkeypatch.setattr(main, "fetch_with_fallback", lambda domain: ("", "", {}))
+    compact = main.compact_performance(main.analyze_performance("example.com"))
+    assert compact == {
+        "loaded": False,
+        "load_time_s": None,
+        "page_size_kb": None,
+        "rating": "F",
+        "grade": "Failed",
+        "insights": []
+    }
+
+
+def test_compact_whois_from_real_output(monkeypatch):
+    expiry = datetime.combine(datetime.now().date(), datetime.min.time()) + timedelta(days=31)
+    record = SimpleNamespace(
+        registrar=["Example Registrar, Inc.", "EXAMPLE REGISTRAR"],
+        creation_date=[datetime(2001, 5, 4)],
+        expiration_date=expiry,
+        name_servers=["ns1.example.com.", "ns2.example.com"]
+    )
+    monkeypatch.setattr(main.whois, "whois", lambda domain: record)
+    compact = main.compact_whois(main.get_whois_info("example.com"))
+    assert compact["registrar"] == "Example Registrar, Inc."
+    assert compact["created"] == "2001-05-04"
+    assert compact["expiry"] == expiry.strftime("%Y-%m-%d")
+    assert compact["expiry_days"] == 30
+    assert compact["nameservers"] == ["NS1.EXAMPLE.COM", "NS2.EXAMPLE.COM"]
+
+
+def test_compact_sections_keep_stable_keys():
+    payload = main.build_compact_response("example.com", {}, datetime(2026, 1, 2, 3, 4, 5), 1.25)
+    assert payload["audited_at"] == "2026-01-02T03:04:05Z"
+    assert payload["processing_ms"] == 1250
+    assert payload["technology"]["tools"] == {"analytics": [], "marketing": [], "cdn": [], "javascript": [], "css": []}
+    assert payload["ads_analytics"] == {"analytics": [], "ad_networks": [], "marketing_tools": []}
+    assert payload["security"] == {"ssl_valid": False, "tls_version": None, "cert_expiry": None, "cert_days": None}
+    assert payload["email"] == {"mx": [], "provider": None, "spf": None, "zone": None}
+
+
+def test_compact_security_and_email():
+    security = main.compact_security({
+        "SSL Certificate": "Valid",
+        "TLS Version": "TLSv1.3",
+        "Certificate Expiry": "2027-01-01 (74 days remaining)",
+        "_cert_expiry": datetime(2027, 1, 1, 12, 0),
+        "_cert_days": 74
+    })
+    assert security == {"ssl_valid": True, "tls_version": "TLSv1.3", "cert_expiry": "2027-01-01", "cert_days": 74}
+    email = main.compact_email({"MX Records": "No MX records found", "Provider": "No email service detected", "SPF": "Not Found", "Resolved For": "example.com"})
+    assert email == {"mx": [], "provider": None, "spf": "not_found", "zone": "example.com"}
+
+
+def test_project_fields_nested_and_missing_paths():
+    payload = {
+        "v": 1,
+        "domain": "example.com",
+        "whois": {"registrar": "R", "expiry_days": 12},
+        "security": {"ssl_valid": True, "cert_days": 74}
+    }
+    projected = main.project_fields(payload, "whois.expiry_days, security ,missing,whois.nope,security.ssl_valid.deeper,")
+    assert projected == {
+        "v": 1,
+        "domain": "example.com",
+        "whois": {"expiry_days": 12},
+        "security": {"ssl_valid": True, "cert_days": 74}
+    }
+    assert main.project_fields(payload, "") == {"v": 1, "domain": "example.com"}
+
+
+def test_negotiate_encoding_honours_qvalues(monkeypatch):
+    monkeypatch.setattr(main, "brotli", object())
+    assert main.negotiate_encoding("") is None
+    assert main.negotiate_encoding("identity") is None
+    assert main.negotiate_encoding("gzip, deflate, br") == "br"
+    assert main.negotiate_encoding("gzip;q=1.0, br;q=0.5") == "gzip"
+    assert main.negotiate_encoding("br;q=0, gzip") == "gzip"
+    assert main.negotiate_encoding("gzip;q=0") is None
+    assert main.negotiate_encoding("*") == "br"
+    assert main.negotiate_encoding("*;q=0.5, br;q=0") == "gzip"
+    assert main.negotiate_encoding("GZIP ; Q=0.8") == "gzip"
+    assert main.negotiate_encoding("gzip;q=bogus") is None
+
+
+def test_negotiate_encoding_without_brotli(monkeypatch):
+    monkeypatch.setattr(main, "brotli", None)
+    assert main.negotiate_encoding("br") is None
+    assert main.negotiate_encoding("br, gzip;q=0.1") == "gzip"
+    assert main.negotiate_encoding("*") == "gzip"
+
+
+def test_render_audit_compresses_large_bodies(monkeypatch):
+    monkeypatch.setattr(main, "brotli", None)
+    request = SimpleNamespace(headers={"accept-encoding": "gzip"})
+    body = main.dump_json({"data": "x" * main.MIN_COMPRESS_BYTES})
+    response = main.render_audit(body, "application/json", request)
+    assert response.headers["content-encoding"] == "gzip"
+    assert main.gzip.decompress(response.body) == body
+    small = main.render_audit(b"{}", "application/json", request)
+    assert "content-encoding" not in small.headers
+    assert small.headers["vary"] == "Accept-Encoding"
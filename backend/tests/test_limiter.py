@@ -0,0 +1,188 @@
+import concurrent.futures
+import threading
+import time
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+def test_try_acquire_sheds_when_full():
+    limiter = main.AdaptiveLimiter("test", initial=2, min_limit=1, max_limit=4, target_latency=1.0)
+    assert limiter.try_acquire()
+    assert limiter.try_acquire()
+    assert not limiter.try_acquire()
+    assert limiter.shed == 1
+    limiter.release(0.1)
+    assert limiter.try_acquire()
+
+
+def test_fast_calls_increase_limit_additively():
+    limiter = main.AdaptiveLimiter("test", initial=2, min_limit=1, max_limit=4, target_latency=1.0)
+    limiter.try_acquire()
+    limiter.release(0.1)
+    assert limiter.limit == pytest.approx(2.5)
+    limiter.try_acquire()
+    limiter.release(0.1)
+    assert limiter.limit == pytest.approx(2.9)
+    for _ in range(20):
+        limiter.try_acquire()
+        limiter.release(0.1)
+    assert limiter.limit == 4
+
+
+def test_slow_call_decreases_limit_multiplicatively():
+    limiter = main.AdaptiveLimiter("test", initial=10, min_limit=2, max_limit=20, target_latency=0.05, backoff=0.5)
+    limiter.try_acquire()
+    limiter.release(0.2)
+    assert limiter.limit == pytest.approx(5)
+    time.sleep(0.06)
+    limiter.try_acquire()
+    limiter.release(0.2)
+    assert limiter.limit == pytest.approx(2.5)
+    time.sleep(0.06)
+    limiter.try_acquire()
+    limiter.release(0.2)
+    assert limiter.limit == 2
+
+
+def test_at_most_one_decrease_per_window():
+    limiter = main.AdaptiveLimiter("test", initial=10, min_limit=1, max_limit=20, target_latency=5.0, backoff=0.5)
+    for _ in range(3):
+        limiter.try_acquire()
+    for _ in range(3):
+        limiter.release(6.0)
+    assert limiter.limit == pytest.approx(5)
+    assert limiter.in_flight == 0
+
+
+def test_slot_releases_on_error():
+    limiter = main.AdaptiveLimiter("test", initial=1, min_limit=1, max_limit=1, target_latency=1.0)
+    with pytest.raises(ValueError):
+        with limiter.slot():
+            raise ValueError("boom")
+    assert limiter.in_flight == 0
+    with limiter.slot():
+        with pytest.raises(main.Overloaded):
+            with limiter.slot():
+                pass
+
+
+# ------------------------------------------------------------
+# Overload behaviour against the in-process stand-ins from conftest.py
+# ------------------------------------------------------------
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.01)
+
+
+def test_overload_sheds_with_retry_after_and_serves_stale(stand_ins):
+    client = TestClient(main.app)
+    main.remember_audit("cached.com", datetime(2026, 1, 1), {"whois": {"Registrar": "Cached Registrar"}, "skipped": []})
+    stage_limits_before = {name: limiter.limit for name, limiter in main.STAGE_LIMITERS.items()}
+    audit_limit_before = stand_ins.limit
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=12) as executor:
+        futures = [executor.submit(client.get, f"/audit/site{i}.com?format=compact") for i in range(12)]
+        wait_until(lambda: stand_ins.in_flight >= int(stand_ins.limit))
+        stale = client.get("/audit/cached.com?format=compact")
+        responses = [f.result() for f in futures]
+
+    statuses = [r.status_code for r in responses]
+    assert 200 in statuses
+    shed = [r for r in responses if r.status_code == 429]
+    assert shed, statuses
+    assert all(int(r.headers["Retry-After"]) >= 1 for r in shed)
+
+    assert stale.status_code == 200
+    assert stale.headers["X-Audit-Cache"] == "stale"
+    assert stale.json()["whois"]["registrar"] == "Cached Registrar"
+
+    # Every stage ran well over its target latency, so every limit backed off
+    assert stand_ins.limit < audit_limit_before
+    for name, limiter in main.STAGE_LIMITERS.items():
+        assert limiter.limit < stage_limits_before[name], name
+
+
+def test_shed_stage_is_reported_as_skipped_not_as_a_finding(stand_ins, monkeypatch):
+    monkeypatch.setitem(main.STAGE_LIMITERS, "tls", main.AdaptiveLimiter("tls", initial=0, min_limit=0, max_limit=1, target_latency=1.0))
+    client = TestClient(main.app)
+    body = client.get("/audit/example.com?format=compact").json()
+    assert body["skipped"] == ["security"]
+    assert body["security"] is None
+    assert body["performance"]["loaded"] is True
+    assert "example.com" not in main._stale_cache
+
+
+def test_shed_audit_without_cache_gets_429(stand_ins):
+    stand_ins.limit = 1
+    stand_ins.try_acquire()
+    try:
+        response = TestClient(main.app).get("/audit/uncached.com")
+    finally:
+        stand_ins.release(0)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"].isdigit()
+
+
+def test_congested_release_decreases_even_when_fast():
+    limiter = main.AdaptiveLimiter("test", initial=10, min_limit=1, max_limit=20, target_latency=5.0, backoff=0.5)
+    with limiter.slot() as outcome:
+        outcome.congested = True
+    assert limiter.limit == pytest.approx(5)
+    # Later congested completions within the window hold the limit rather than raise it
+    for _ in range(5):
+        with limiter.slot() as outcome:
+            outcome.congested = True
+    assert limiter.limit == pytest.approx(5)
+
+
+def test_stage_shedding_never_raises_audit_limit(stand_ins, monkeypatch):
+    monkeypatch.setitem(main.STAGE_LIMITERS, "http", main.AdaptiveLimiter("http", initial=2, min_limit=2, max_limit=2, target_latency=60.0))
+    stand_ins.target_latency = 60.0
+    limits = []
+    release = stand_ins.release
+
+    def tracked_release(latency, congested=False):
+        release(latency, congested)
+        limits.append(stand_ins.limit)
+
+    monkeypatch.setattr(stand_ins, "release", tracked_release)
+    client = TestClient(main.app)
+    audit_limit_before = stand_ins.limit
+
+    def run_client(i):
+        return [client.get(f"/audit/c{i}-{n}.com?format=compact") for n in range(4)]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        responses = [r for batch in executor.map(run_client, range(4)) for r in batch]
+
+    skipped = [r for r in responses if r.status_code == 200 and r.json()["skipped"]]
+    assert skipped
+    assert main.STAGE_LIMITERS["http"].shed > 0
+    assert max(limits) <= audit_limit_before
+    assert stand_ins.limit < audit_limit_before
+
+
+def test_stage_slot_waits_out_a_short_spike(monkeypatch):
+    limiter = main.AdaptiveLimiter("http", initial=1, min_limit=1, max_limit=1, target_latency=60.0)
+    monkeypatch.setitem(main.STAGE_LIMITERS, "http", limiter)
+    monkeypatch.setattr(main, "STAGE_SLOT_WAIT", 1.0)
+    limiter.try_acquire()
+    threading.Timer(0.1, limiter.release, args=(0.1,)).start()
+    with main.stage_slot("http"):
+        assert limiter.in_flight == 1
+    assert limiter.shed == 0
+
+
+def test_stage_limits_fit_a_full_audit_limit():
+    peak_audits = main.AUDIT_LIMITER.max_limit
+    assert main.STAGE_LIMITERS["http"].limit >= 4 * peak_audits
+    assert main.STAGE_LIMITERS["dns"].limit >= 2 * peak_audits
+    assert main.STAGE_LIMITERS["tls"].limit >= peak_audits
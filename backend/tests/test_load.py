@@ -0,0 +1,72 @@
+import concurrent.futures
+import time
+
+from fastapi.testclient import TestClient
+
+import main
+
+CLIENTS = 6
+DURATION = 3.0
+
+
+def run_sustained_load(client, stand_ins, monkeypatch):
+    """Keep CLIENTS audits in flight for DURATION seconds, recording every audit limit change."""
+    limits = []
+    release = stand_ins.release
+
+    def tracked_release(latency, congested=False):
+        release(latency, congested)
+        limits.append(stand_ins.limit)
+
+    monkeypatch.setattr(stand_ins, "release", tracked_release)
+    deadline = time.monotonic() + DURATION
+
+    def run_client(i):
+        responses, n = [], 0
+        while time.monotonic() < deadline:
+            responses.append(client.get(f"/audit/site{i}-{n}.example.com?format=compact"))
+            n += 1
+        return responses
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=CLIENTS) as executor:
+        responses = [r for batch in executor.map(run_client, range(CLIENTS)) for r in batch]
+    return responses, limits
+
+
+def test_sustained_load_against_local_services(local_services, stand_ins, monkeypatch):
+    # The HTTP stage is the bottleneck: three concurrent fetches, however fast they are
+    monkeypatch.setitem(main.STAGE_LIMITERS, "http", main.AdaptiveLimiter("http", initial=3, min_limit=3, max_limit=3, target_latency=60.0))
+    stand_ins.target_latency = 60.0
+    audit_limit_before = stand_ins.limit
+
+    responses, limits = run_sustained_load(TestClient(main.app), stand_ins, monkeypatch)
+
+    ok = [r.json() for r in responses if r.status_code == 200]
+    shed = [r for r in responses if r.status_code == 429]
+    assert ok
+    assert all(r.headers["Retry-After"].isdigit() for r in shed)
+    assert any(body["skipped"] for body in ok)
+    assert main.STAGE_LIMITERS["http"].shed > 0
+    # While stages are shedding the audit limit falls or holds, never grows
+    assert limits and max(limits) <= audit_limit_before
+    assert stand_ins.limit < audit_limit_before
+
+    # Traffic really went through the stand-ins, including the Retry path
+    assert local_services.http.requests > 0
+    assert local_services.http.failures > 0
+    assert all(body["hosting"]["ip"] == "127.0.0.1" for body in ok if "hosting" not in body["skipped"])
+
+
+def test_local_services_answer_a_full_audit(local_services, stand_ins):
+    for limiter in main.STAGE_LIMITERS.values():
+        limiter.target_latency = 60.0
+    body = TestClient(main.app).get("/audit/shop.example.com?format=compact").json()
+    assert body["skipped"] == []
+    assert body["hosting"] == {"ip": "127.0.0.1", "web_server": "nginx", "provider": "Nginx"}
+    assert body["email"]["mx"] == ["mx.example.com"]
+    assert body["email"]["spf"] == "valid"
+    # The host has no records of its own; the section says they belong to the zone
+    assert body["email"]["zone"] == "example.com"
+    assert body["technology"]["cms"] == "WordPress"
+    assert body["performance"]["loaded"] is True
+    assert body["security"]["ssl_valid"] is False
@@ -0,0 +1,76 @@
+import concurrent.futures
+import time
+
+import dns.exception
+import dns.resolver
+import pytest
+
+import main
+
+
+@pytest.fixture(autouse=True)
+def empty_zone_cache(monkeypatch):
+    monkeypatch.setattr(main, "_zone_cache", main.OrderedDict())
+    monkeypatch.setattr(main, "_zone_inflight", {})
+
+
+def test_email_lookup_error_is_a_failure_not_a_finding(monkeypatch):
+    def timeout(domain, rdtype):
+        raise dns.exception.Timeout()
+
+    monkeypatch.setattr(main.resolver, "resolve", timeout)
+    assert main.get_email_setup("example.com") == {}
+
+
+def test_email_missing_records_are_a_finding(monkeypatch):
+    def missing(domain, rdtype):
+        raise dns.resolver.NoAnswer()
+
+    monkeypatch.setattr(main.resolver, "resolve", missing)
+    assert main.get_email_setup("example.com") == {
+        "MX Records": "No MX records found",
+        "Provider": "No email service detected",
+        "SPF": "Not Found",
+        "Resolved For": "example.com"
+    }
+
+
+def test_failed_zone_section_is_cached_briefly(monkeypatch):
+    calls = []
+
+    def failing_whois(domain):
+        calls.append(domain)
+        time.sleep(0.1)
+        return {}
+
+    monkeypatch.setitem(main.ZONE_SECTIONS, "whois", failing_whois)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
+        results = list(executor.map(lambda _: main.get_zone_section("whois", "example.com"), range(5)))
+    assert results == [{}] * 5
+    assert calls == ["example.com"]
+
+    monkeypatch.setattr(main, "ZONE_FAILURE_TTL", 0)
+    main.get_zone_section("whois", "example.com")
+    assert calls == ["example.com", "example.com"]
+
+
+def test_successful_zone_section_outlives_failure_ttl(monkeypatch):
+    calls = []
+    monkeypatch.setitem(main.ZONE_SECTIONS, "whois", lambda domain: calls.append(domain) or {"Registrar": "R"})
+    monkeypatch.setattr(main, "ZONE_FAILURE_TTL", 0)
+    assert main.get_zone_section("whois", "example.com") == {"Registrar": "R"}
+    assert main.get_zone_section("whois", "example.com") == {"Registrar": "R"}
+    assert calls == ["example.com"]
+
+
+def test_overloaded_zone_section_is_not_cached(monkeypatch):
+    def shed(domain):
+        raise main.Overloaded("dns")
+
+    monkeypatch.setitem(main.ZONE_SECTIONS, "email", shed)
+    with pytest.raises(main.Overloaded):
+        main.get_zone_section("email", "example.com")
+    assert ("email", "example.com") not in main._zone_cache
+    assert main._zone_inflight == {}
+    monkeypatch.setitem(main.ZONE_SECTIONS, "email", lambda domain: {"SPF": "Valid"})
+    assert main.get_zone_section("email", "example.com") == {"SPF": "Valid"}
@@ -351,6 +351,9 @@ export default function AuditResults({ results = {}, onNewAudit }) {
         {emailData.SPF && (
           <StatusRow label="SPF Record" value={emailData.SPF} />
         )}
+        {emailData["Resolved For"] && (
+          <Row label="Records For" value={emailData["Resolved For"]} />
+        )}
       </>
     );
   };